@@ -29,29 +29,279 @@ Attributes:
 """
 
 
+import asyncio
 import calendar
+import functools
 
-from datetime import date, timedelta
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
 from typing import Union
 
+from google.cloud import bigquery
 from google.cloud.bigquery.client import Client
 
-from messenger import send_slack_message as send_slack_message_to_channel
-from settings import Settings
+from messenger import send_slack_message
+from settings import get_settings
 
-SETTINGS = Settings()
+SETTINGS = get_settings()
 
-def send_slack_message(text: str = None,
-                       blocks: list = None):
-    """Wraps the messenger slack message, adding on a slack channel from settings
+# Upper bound on BigQuery jobs dispatched concurrently. Kept well below the
+# default per-project concurrent interactive query quota.
+MAX_CONCURRENT_QUERIES = 16
+
+# Slack rejects messages carrying more than 50 blocks.
+SLACK_MAX_BLOCKS_PER_MESSAGE = 50
+
+# Defaults applied to every query job. The results cache is free and the
+# bytes-billed cap aborts any query that would fall back to a full scan of
+# the billing table, e.g. if partition pruning ever regresses.
+QUERY_JOB_DEFAULTS = {
+    'use_query_cache': True,
+    'priority': bigquery.QueryPriority.INTERACTIVE,
+    'maximum_bytes_billed': 5_000_000_000,
+}
+
+# SQL templates, built once at import. The fully-qualified billing table
+# name comes from settings, which are only loaded inside `run()`, so it is
+# substituted via `build_query` rather than at definition time.
+QUERY_PROJECT_IDS_WITH_MONTHLY_COST = (
     """
-    send_slack_message_to_channel(
-        channel=SETTINGS.SLACK_CHANNEL,
-        api_token=SETTINGS.SLACK_API_TOKEN,
-        text=text,
-        blocks=blocks
-    )
-    
+    SELECT DISTINCT project.id AS pid
+    FROM {table}
+    WHERE
+      _PARTITIONTIME BETWEEN TIMESTAMP(@month_start)
+      AND TIMESTAMP(@today)
+      AND project.id IS NOT NULL
+      AND cost > 0;
+    """)
+
+QUERY_PROJECT_DAILY_COST = (
+    """
+    SELECT
+      SUM(cost) as cost,
+      ANY_VALUE(currency) as currency
+    FROM {table}
+    WHERE
+      _PARTITIONTIME = TIMESTAMP(@day)
+      AND project.id=@pid;
+    """)
+
+QUERY_ALL_PROJECTS_DAILY_COSTS = (
+    """
+    SELECT
+      SUM(cost) as cost,
+      project.id as pid,
+      ANY_VALUE(currency) as currency,
+      DATE(_PARTITIONTIME) as date
+    FROM {table}
+    WHERE
+      _PARTITIONTIME BETWEEN TIMESTAMP(@start_day)
+      AND TIMESTAMP(@end_day)
+      AND project.id IS NOT NULL
+    GROUP BY pid, date
+    ORDER BY date DESC, cost DESC;
+    """)
+
+QUERY_DAILY_TOTAL_COST = (
+    """
+    SELECT
+      SUM(cost) as cost_sum,
+      ANY_VALUE(currency) as currency
+    FROM {table}
+    WHERE
+      _PARTITIONTIME = TIMESTAMP(@day);
+    """)
+
+QUERY_MONTHLY_TOTAL_COST = (
+    """
+    SELECT
+      SUM(cost) as cost_sum,
+      ANY_VALUE(currency) as currency
+    FROM {table}
+    WHERE
+      _PARTITIONTIME BETWEEN TIMESTAMP(@month_start)
+      AND TIMESTAMP(@today);
+    """)
+
+QUERY_PROJECT_DAILY_TOP_SERVICES = (
+    """
+    SELECT
+      SUM(cost) as cost,
+      service.description as service_desc,
+      ANY_VALUE(currency) as currency,
+    FROM {table}
+    WHERE
+      _PARTITIONTIME BETWEEN TIMESTAMP(@start_day)
+      AND TIMESTAMP(@today)
+      AND project.id=@pid
+    GROUP BY service_desc
+    ORDER BY(cost) DESC
+    LIMIT {number};
+    """)
+
+# Variants of the cost aggregate queries reading from the materialized view
+# created by `sql/daily_project_cost.sql` (day/project/currency grain), used
+# when `SETTINGS.SUMMARY_TABLE_NAME` is set. The top services query has no
+# variant as the view does not carry the service breakdown.
+QUERY_PROJECT_IDS_WITH_MONTHLY_COST_SUMMARY = (
+    """
+    SELECT DISTINCT pid
+    FROM {table}
+    WHERE
+      d BETWEEN @month_start AND @today
+      AND pid IS NOT NULL
+      AND cost > 0;
+    """)
+
+QUERY_PROJECT_DAILY_COST_SUMMARY = (
+    """
+    SELECT
+      SUM(cost) as cost,
+      ANY_VALUE(currency) as currency
+    FROM {table}
+    WHERE
+      d = @day
+      AND pid=@pid;
+    """)
+
+QUERY_ALL_PROJECTS_DAILY_COSTS_SUMMARY = (
+    """
+    SELECT
+      SUM(cost) as cost,
+      pid,
+      ANY_VALUE(currency) as currency,
+      d as date
+    FROM {table}
+    WHERE
+      d BETWEEN @start_day AND @end_day
+      AND pid IS NOT NULL
+    GROUP BY pid, date
+    ORDER BY date DESC, cost DESC;
+    """)
+
+QUERY_DAILY_TOTAL_COST_SUMMARY = (
+    """
+    SELECT
+      SUM(cost) as cost_sum,
+      ANY_VALUE(currency) as currency
+    FROM {table}
+    WHERE
+      d = @day;
+    """)
+
+QUERY_MONTHLY_TOTAL_COST_SUMMARY = (
+    """
+    SELECT
+      SUM(cost) as cost_sum,
+      ANY_VALUE(currency) as currency
+    FROM {table}
+    WHERE
+      d BETWEEN @month_start AND @today;
+    """)
+
+
+@functools.lru_cache(maxsize=1)
+def get_qualified_table_name() -> str:
+    """Builds the fully-qualified billing table name from settings.
+
+    Cached, since settings do not change after being loaded.
+
+    Returns:
+        The `project.dataset.table` name of the billing table.
+
+    """
+    return f'{SETTINGS.PROJECT_ID}.{SETTINGS.DATA_SET}.{SETTINGS.TABLE_NAME}'
+
+
+@functools.lru_cache(maxsize=1)
+def get_qualified_summary_table_name() -> str:
+    """Builds the fully-qualified summary table (materialized view) name
+    from settings.
+
+    Cached, since settings do not change after being loaded.
+
+    Returns:
+        The `project.dataset.table` name of the summary table.
+
+    """
+    return (f'{SETTINGS.PROJECT_ID}.{SETTINGS.DATA_SET}.'
+            f'{SETTINGS.SUMMARY_TABLE_NAME}')
+
+
+@functools.lru_cache(maxsize=None)
+def build_query(template: str, table: str = None, **substitutions) -> str:
+    """Builds query SQL from one of the module-level templates.
+
+    Substitutes the billing table name plus any further placeholders.
+    Cached so each query text is only formatted once per process.
+
+    Args:
+        template: The SQL template to build.
+        table: The fully-qualified table to read from. Defaults to the
+            raw billing table.
+        substitutions: Any further placeholder values the template needs.
+
+    Returns:
+        The query SQL.
+
+    """
+    if table is None:
+        table = get_qualified_table_name()
+    return template.format(table=table, **substitutions)
+
+
+def build_cost_query(template: str, summary_template: str) -> str:
+    """Builds the SQL for a cost aggregate, preferring the summary table.
+
+    When `SETTINGS.SUMMARY_TABLE_NAME` is configured the pre-aggregated
+    materialized view is read, which is orders of magnitude smaller than
+    the raw billing table; otherwise the raw table is scanned. Both
+    template variants take the same query parameters.
+
+    Args:
+        template: The SQL template reading the raw billing table.
+        summary_template: The equivalent template reading the summary table.
+
+    Returns:
+        The query SQL.
+
+    """
+    if SETTINGS.SUMMARY_TABLE_NAME:
+        return build_query(summary_template,
+                           table=get_qualified_summary_table_name())
+    return build_query(template)
+
+
+def make_query_job_config(
+        *query_parameters: bigquery.ScalarQueryParameter
+) -> bigquery.QueryJobConfig:
+    """Builds a query job config with `QUERY_JOB_DEFAULTS` applied.
+
+    Args:
+        query_parameters: The query parameters for the job, if any.
+
+    Returns:
+        The query job config.
+
+    """
+    return bigquery.QueryJobConfig(query_parameters=list(query_parameters),
+                                   **QUERY_JOB_DEFAULTS)
+
+
+def get_utc_today() -> date:
+    """Gets today's date in UTC.
+
+    The query date windows are anchored on this rather than the process's
+    local date, since `_PARTITIONTIME` is itself UTC-based and the tool may
+    run on a non-UTC machine.
+
+    Returns:
+        The current UTC date.
+
+    """
+    return datetime.now(timezone.utc).date()
+
 
 def get_project_ids_with_monthly_cost(client: Client) -> list:
     """Gets a list of all project IDs within the billing data from BigQuery.
@@ -61,32 +311,37 @@ def get_project_ids_with_monthly_cost(client: Client) -> list:
         Project ID(s)
 
     """
-    query = (
-        f"""
-        SELECT DISTINCT project.id AS pid
-        FROM {SETTINGS.PROJECT_ID}.{SETTINGS.DATA_SET}.{SETTINGS.TABLE_NAME}
-        WHERE
-          _PARTITIONTIME BETWEEN TIMESTAMP_TRUNC(
-            CURRENT_TIMESTAMP(), MONTH, 'UTC')
-          AND TIMESTAMP_TRUNC(CURRENT_TIMESTAMP(), DAY, 'UTC')
-          AND project.id IS NOT NULL
-          AND cost > 0;
-        """)
-    query_job = client.query(query)
-    return [row.pid for row in query_job.result() if row.pid is not None]
-
-
-def round_cost_value(cost: float,
-                     precision: int = SETTINGS.ROUNDING_PRECISION) -> float:
+    query = build_cost_query(QUERY_PROJECT_IDS_WITH_MONTHLY_COST,
+                             QUERY_PROJECT_IDS_WITH_MONTHLY_COST_SUMMARY)
+    today = get_utc_today()
+    job_config = make_query_job_config(
+        bigquery.ScalarQueryParameter('month_start', 'DATE',
+                                      today.replace(day=1)),
+        bigquery.ScalarQueryParameter('today', 'DATE', today))
+    rows_iter = client.query_and_wait(query, job_config=job_config)
+    # Read via the BigQuery Storage API: binary columnar transport instead
+    # of paginated REST, which matters once the organisation has many
+    # projects. The single-row aggregate queries stay on the REST path as
+    # the Storage API only pays off for larger result sets.
+    arrow_table = rows_iter.to_arrow(create_bqstorage_client=True)
+    return [pid for pid in arrow_table.column('pid').to_pylist()
+            if pid is not None]
+
+
+def round_cost_value(cost: float, precision: int = None) -> float:
     """Used to consistently round all cost values to the same format
 
     Args:
         cost: The cost of which to round.
-        precision: The precision with which to round.
+        precision: The precision with which to round. Defaults to
+            `SETTINGS.ROUNDING_PRECISION`, resolved at call time so that
+            environment overrides loaded in `run()` take effect.
 
     Returns:
         The rounded value.
     """
+    if precision is None:
+        precision = SETTINGS.ROUNDING_PRECISION
     return round(cost, precision)
 
 
@@ -103,43 +358,73 @@ def get_cost_filter_project_daily_interval(client: Client,
        Cost data, including currency and date.
 
     """
-    query = (
-        f"""
-        SELECT
-          SUM(cost) as cost,
-          currency as currency,
-          TIMESTAMP_TRUNC(TIMESTAMP_SUB(
-            CURRENT_TIMESTAMP(), INTERVAL {days_ago} DAY),DAY
-          ) as date
-        FROM {SETTINGS.PROJECT_ID}.{SETTINGS.DATA_SET}.{SETTINGS.TABLE_NAME}
-        WHERE
-          _PARTITIONTIME BETWEEN TIMESTAMP_TRUNC(TIMESTAMP_SUB(
-            CURRENT_TIMESTAMP(), INTERVAL {days_ago} DAY),DAY
-          )
-          AND TIMESTAMP_TRUNC(TIMESTAMP_SUB(
-            CURRENT_TIMESTAMP(), INTERVAL {days_ago} DAY),DAY
-          )
-          AND project.id='{project_id}'
-        GROUP BY currency
-        LIMIT 1;
-        """)
-    query_job = client.query(query)
-    rows_iter = query_job.result(max_results=1)
-    rows = list(rows_iter)
-
-    if rows:
+    query = build_cost_query(QUERY_PROJECT_DAILY_COST,
+                             QUERY_PROJECT_DAILY_COST_SUMMARY)
+    day = get_utc_today() - timedelta(days=days_ago)
+    job_config = make_query_job_config(
+        bigquery.ScalarQueryParameter('day', 'DATE', day),
+        bigquery.ScalarQueryParameter('pid', 'STRING', project_id))
+    row = next(iter(client.query_and_wait(query,
+                                          job_config=job_config,
+                                          max_results=1)), None)
+
+    # Without a GROUP BY, an empty partition yields one row of NULLs.
+    if row is not None and row.cost is not None:
         return {
-            'cost': round_cost_value(rows[0].cost),
-            'currency': rows[0].currency,
-            'date': rows[0].date.isoformat()
+            'cost': round_cost_value(row.cost),
+            'currency': row.currency,
+            'date': day.isoformat()
         }
-    return {  # Default, when there's no data.
+    return make_empty_daily_cost(days_ago)
+
+
+def make_empty_daily_cost(days_ago: int) -> dict:
+    """Builds the default cost entry used when there is no billing data for
+    the requested day.
+
+    Args:
+        days_ago: The number of days ago from today the entry represents.
+
+    Returns:
+        Cost data with zero cost, including an empty currency and the date.
+
+    """
+    return {
         'cost': 0.0,
         'currency': '',
-        'date': (date.today() - timedelta(days=days_ago)).isoformat()
+        'date': (get_utc_today() - timedelta(days=days_ago)).isoformat()
     }
 
 
+def get_costs_daily_interval_all_projects(client: Client) -> dict:
+    """Gets cost data for the past two days for every project with a single
+    partition-pruned query, instead of one query per project per day.
+
+    Returns:
+        Cost data keyed by project ID, then by the number of days ago.
+        Projects are keyed in descending order of the previous day's cost,
+        as ordered by the query.
+
+    """
+    query = build_cost_query(QUERY_ALL_PROJECTS_DAILY_COSTS,
+                             QUERY_ALL_PROJECTS_DAILY_COSTS_SUMMARY)
+    today = get_utc_today()
+    job_config = make_query_job_config(
+        bigquery.ScalarQueryParameter('start_day', 'DATE',
+                                      today - timedelta(days=2)),
+        bigquery.ScalarQueryParameter('end_day', 'DATE',
+                                      today - timedelta(days=1)))
+    rows_by_project = defaultdict(dict)
+    for row in client.query_and_wait(query, job_config=job_config):
+        days_ago = (today - row.date).days
+        rows_by_project[row.pid][days_ago] = {
+            'cost': round_cost_value(row.cost),
+            'currency': row.currency,
+            'date': row.date.isoformat()
+        }
+    return rows_by_project
+
+
 def get_gcp_daily_total_cost(client: Client) -> dict:
     """Gets cost data for the past day for all projects.
 
@@ -147,34 +432,26 @@ def get_gcp_daily_total_cost(client: Client) -> dict:
        Cost data, including currency and date (ISO 8601).
 
     """
-    query = (
-        f"""
-        SELECT
-          SUM(cost) as cost_sum,
-          currency as currency,
-          DATE_SUB(CURRENT_DATE(), INTERVAL 1 DAY) as date,
-        FROM {SETTINGS.PROJECT_ID}.{SETTINGS.DATA_SET}.{SETTINGS.TABLE_NAME}
-        WHERE
-          CAST(DATE(
-            _PARTITIONTIME) AS DATE) = DATE_SUB(CURRENT_DATE(), INTERVAL 1 DAY)
-        GROUP BY currency
-        LIMIT 1;
-        """)
-    query_job = client.query(query)
-    rows_iter = query_job.result(max_results=1)
-    rows = list(rows_iter)
-
-    if rows:
+    query = build_cost_query(QUERY_DAILY_TOTAL_COST,
+                             QUERY_DAILY_TOTAL_COST_SUMMARY)
+    day = get_utc_today() - timedelta(days=1)
+    job_config = make_query_job_config(
+        bigquery.ScalarQueryParameter('day', 'DATE', day))
+    row = next(iter(client.query_and_wait(query,
+                                          job_config=job_config,
+                                          max_results=1)), None)
+
+    # Without a GROUP BY, an empty partition yields one row of NULLs.
+    if row is not None and row.cost_sum is not None:
         return {
-            'cost_sum': round_cost_value(rows[0].cost_sum),
-            'currency': rows[0].currency,
-            'date': rows[0].date.isoformat()
+            'cost_sum': round_cost_value(row.cost_sum),
+            'currency': row.currency,
+            'date': day.isoformat()
         }
-    one_month_ago = date.today().replace(day=1) - timedelta(days=1)
     return {  # Default, when there's no data.
         'cost_sum': 0.0,
         'currency': '',
-        'date': f'{one_month_ago.year}-{one_month_ago.month}'
+        'date': day.isoformat()
     }
 
 
@@ -185,59 +462,54 @@ def get_gcp_monthly_total_cost(client: Client) -> dict:
        Cost data, including currency and (month) date (ISO 8601).
 
     """
-    query = (
-        f"""
-        SELECT
-          SUM(cost) as cost_sum,
-          currency as currency,
-          TIMESTAMP_TRUNC(CURRENT_TIMESTAMP(), MONTH, 'UTC') as month
-        FROM {SETTINGS.PROJECT_ID}.{SETTINGS.DATA_SET}.{SETTINGS.TABLE_NAME}
-        WHERE
-          _PARTITIONTIME BETWEEN TIMESTAMP_TRUNC(
-            CURRENT_TIMESTAMP(), MONTH, 'UTC')
-          AND TIMESTAMP_TRUNC(CURRENT_TIMESTAMP(), DAY, 'UTC')
-        GROUP BY currency
-        LIMIT 1;
-        """)
-    query_job = client.query(query)
-    rows_iter = query_job.result(max_results=1)
-    rows = list(rows_iter)
-    return {
-        'cost_sum': round_cost_value(rows[0].cost_sum),
-        'currency': rows[0].currency,
-        'date': rows[0].month.isoformat()
+    query = build_cost_query(QUERY_MONTHLY_TOTAL_COST,
+                             QUERY_MONTHLY_TOTAL_COST_SUMMARY)
+    today = get_utc_today()
+    month_start = today.replace(day=1)
+    job_config = make_query_job_config(
+        bigquery.ScalarQueryParameter('month_start', 'DATE', month_start),
+        bigquery.ScalarQueryParameter('today', 'DATE', today))
+    row = next(iter(client.query_and_wait(query,
+                                          job_config=job_config,
+                                          max_results=1)), None)
+
+    # Without a GROUP BY, an empty table yields one row of NULLs.
+    if row is not None and row.cost_sum is not None:
+        return {
+            'cost_sum': round_cost_value(row.cost_sum),
+            'currency': row.currency,
+            'date': month_start.isoformat()
+        }
+    return {  # Default, when there's no data.
+        'cost_sum': 0.0,
+        'currency': '',
+        'date': month_start.isoformat()
     }
 
 
 def get_gcp_project_daily_top_services(
         client: Client,
         project_id: str,
-        number: int = SETTINGS.NUMBER_OF_TOP_SERVICES_TO_INVESTIGATE) -> list:
+        number: int = None) -> list:
     """Gets data on daily top `number` of the highest costing services on the
-    given `project_id`.
+    given `project_id`. `number` defaults to
+    `SETTINGS.NUMBER_OF_TOP_SERVICES_TO_INVESTIGATE`, resolved at call time
+    so that environment overrides loaded in `run()` take effect.
 
     Returns:
        Data on top services and cost
 
     """
-    query = (
-        f"""
-        SELECT
-          SUM(cost) as cost,
-          service.description as service_desc,
-          currency as currency,
-        FROM {SETTINGS.PROJECT_ID}.{SETTINGS.DATA_SET}.{SETTINGS.TABLE_NAME}
-        WHERE
-          _PARTITIONTIME BETWEEN TIMESTAMP_TRUNC(
-            TIMESTAMP_SUB(CURRENT_TIMESTAMP(), INTERVAL 24 HOUR),DAY)
-          AND  TIMESTAMP_TRUNC(CURRENT_TIMESTAMP(), DAY)
-          AND project.id='{project_id}'
-        GROUP BY service_desc, currency
-        ORDER BY(cost) DESC
-        LIMIT {number};
-        """)
-    query_job = client.query(query)
-    rows_iter = query_job.result()
+    if number is None:
+        number = SETTINGS.NUMBER_OF_TOP_SERVICES_TO_INVESTIGATE
+    query = build_query(QUERY_PROJECT_DAILY_TOP_SERVICES, number=number)
+    today = get_utc_today()
+    job_config = make_query_job_config(
+        bigquery.ScalarQueryParameter('start_day', 'DATE',
+                                      today - timedelta(days=1)),
+        bigquery.ScalarQueryParameter('today', 'DATE', today),
+        bigquery.ScalarQueryParameter('pid', 'STRING', project_id))
+    rows_iter = client.query_and_wait(query, job_config=job_config)
     top_services = []
     for row in rows_iter:
         top_services.append({
@@ -259,53 +531,69 @@ def get_projected_cost(days_remaining: Union[float, int],
     return total_past_month + (days_remaining * total_past_day)
 
 
-def get_days_in_month(month: int = date.today().month,
-                      year: int = date.today().year) -> int:
+def get_days_in_month(month: int = None, year: int = None) -> int:
     """Gets the days in the specified month.
 
     Args:
-        month: Lookup month.
-        year: Lookup year.
+        month: Lookup month. Defaults to the present month.
+        year: Lookup year. Defaults to the present year.
 
     Returns:
         Total days in the specified month.
     """
-    return calendar.monthrange(year, month)[1]
+    today = date.today()
+    return calendar.monthrange(year or today.year, month or today.month)[1]
 
 
 def compute_days_remaining_in_present_month(
-        days_in_month: int = get_days_in_month()) -> int:
+        days_in_month: int = None) -> int:
     """Gets the days remaining in the current month.
 
     Args:
-        days_in_month: Total days in the month.
+        days_in_month: Total days in the month. Defaults to the total days
+            in the present month.
 
     Returns:
         Number of days remaining in present month.
     """
-    return days_in_month - date.today().day
+    today = date.today()
+    if days_in_month is None:
+        days_in_month = get_days_in_month(today.month, today.year)
+    return days_in_month - today.day
 
 
 def get_status(
         current_cost: float,
         past_cost: float,
-        threshold: Union[int, float] = SETTINGS.WARNING_THRESHOLD_MULTIPLIER) -> str:
+        threshold: Union[int, float] = None) -> str:
     """Intended to determine the status based on two cost values from different
     time periods.
 
     * If the current cost exceeds the limit, warning status is set.
     * If the current cost is zero, or otherwise, status is considered
     to be nominal.
+    * If there is no past cost to compare against (e.g. the project had no
+    billing data the day before), only the minimum-cost floor applies.
 
     Args:
         current_cost: The current, or most recent cost.
         past_cost: The past cost with which to do the comparison.
         threshold: The threshold above the `past_cost` allowed before nominal
-            status is no longer nominal.
+            status is no longer nominal. Defaults to
+            `SETTINGS.WARNING_THRESHOLD_MULTIPLIER`, resolved at call time
+            so that environment overrides loaded in `run()` take effect.
 
     Returns:
         The determined status.
     """
+    if threshold is None:
+        threshold = SETTINGS.WARNING_THRESHOLD_MULTIPLIER
+
+    if past_cost == 0:
+        if current_cost >= SETTINGS.MINIMUM_COST_FOR_WARNING:
+            return SETTINGS.STATUS_WARNING
+        return SETTINGS.STATUS_NOMINAL
+
     limit = past_cost * threshold
     if (current_cost != 0 and current_cost >= limit and
             current_cost >= SETTINGS.MINIMUM_COST_FOR_WARNING):
@@ -313,37 +601,59 @@ def get_status(
     return SETTINGS.STATUS_NOMINAL
 
 
-def get_costs(client: Client, project_ids: list) -> list:
+def get_costs(client: Client,
+              project_ids: list,
+              rows_by_project: dict = None) -> list:
     """Gets costs for the past two days for each project ID in the list.
     The two-day data used to perform a comparison and determine whether the
     project is nominal status or not.
 
     Args:
         project_ids: One or more GCP project ID(s)
+        rows_by_project: Optional pre-fetched result of
+            `get_costs_daily_interval_all_projects`. Queried when not given.
 
     Returns:
-        Cost data for all projects, with the `project_id` as the uppermost key.
+        Cost data for all projects, ordered by the previous day's cost
+        (most expensive first), with the `project_id` as the uppermost key.
     """
     costs = []
-    for project_id in get_project_ids_with_monthly_cost(client):
-        one_day_ago = get_cost_filter_project_daily_interval(client, project_id, 1)
-        two_days_ago = get_cost_filter_project_daily_interval(client, project_id, 2)
+    if rows_by_project is None:
+        rows_by_project = get_costs_daily_interval_all_projects(client)
+
+    # `rows_by_project` is already ordered by the previous day's cost, so
+    # rank projects in that order; projects without any cost rows in the
+    # past two days follow in their given order.
+    queried_ids = set(project_ids)
+    ordered_ids = [pid for pid in rows_by_project if pid in queried_ids]
+    ordered_ids += [pid for pid in project_ids if pid not in rows_by_project]
+    for project_id in ordered_ids:
+        project_rows = rows_by_project.get(project_id, {})
+        one_day_ago = project_rows.get(1, make_empty_daily_cost(1))
+        two_days_ago = project_rows.get(2, make_empty_daily_cost(2))
         status = get_status(one_day_ago['cost'], two_days_ago['cost'])
 
-        project_costs = {
+        costs.append({
             'id': project_id,
             'one_day_ago': one_day_ago,
             'two_days_ago': two_days_ago,
             'status': status
-        }
+        })
 
-        # Get info on highest costing services if `SETTINGS.STATUS_WARNING`
-        if status == SETTINGS.STATUS_WARNING:
-            project_costs['top_services'] = get_gcp_project_daily_top_services(
-                client,
-                project_id
-            )
-        costs.append(project_costs)
+    # Get info on highest costing services if `SETTINGS.STATUS_WARNING`.
+    # The per-project queries are independent, so dispatch them concurrently.
+    warning_costs = [project_costs for project_costs in costs
+                     if project_costs['status'] == SETTINGS.STATUS_WARNING]
+    if warning_costs:
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_QUERIES) as executor:
+            top_services_futures = [
+                executor.submit(get_gcp_project_daily_top_services,
+                                client,
+                                project_costs['id'])
+                for project_costs in warning_costs
+            ]
+        for project_costs, future in zip(warning_costs, top_services_futures):
+            project_costs['top_services'] = future.result()
     return costs
 
 
@@ -365,14 +675,29 @@ def get_analysis(client: Client) -> dict:
         }
 
     """
+    # The top-level queries are independent of each other, so dispatch them
+    # concurrently and overlap their network latency.
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_QUERIES) as executor:
+        past_day_future = executor.submit(get_gcp_daily_total_cost, client)
+        past_month_future = executor.submit(get_gcp_monthly_total_cost, client)
+        project_ids_future = executor.submit(
+            get_project_ids_with_monthly_cost, client)
+        rows_by_project_future = executor.submit(
+            get_costs_daily_interval_all_projects, client)
+
     # Days remaining used to determined projected cost
-    past_day = get_gcp_daily_total_cost(client)
-    past_month = get_gcp_monthly_total_cost(client)
+    past_day = past_day_future.result()
+    past_month = past_month_future.result()
     days_remaining = compute_days_remaining_in_present_month()
 
-    # Get the projected cost
+    # Get the projected cost. An empty currency means there was no billing
+    # data for that period, so fall back to whichever side has one rather
+    # than failing the whole run.
     if past_day['currency'] == past_month['currency']:
         projected_cost_currency = past_day['currency']
+    elif not past_day['currency'] or not past_month['currency']:
+        projected_cost_currency = (past_day['currency'] or
+                                   past_month['currency'])
     else:
         raise Exception(('Projected cost cannot be calculated without' +
                          'matching currencies'))
@@ -380,16 +705,13 @@ def get_analysis(client: Client) -> dict:
                                         past_day['cost_sum'],
                                         past_month['cost_sum'])
 
-    # Get and sort breakdown based on most expensive cost
-    breakdown = get_costs(client, get_project_ids_with_monthly_cost(client))
-    sorted_breakdown = sorted(
-        breakdown,
-        key=lambda x: x['one_day_ago']['cost'],
-        reverse=True
-    )
+    # Get the breakdown; get_costs returns it sorted on most expensive cost
+    breakdown = get_costs(client,
+                          project_ids_future.result(),
+                          rows_by_project_future.result())
 
     return {
-        'breakdown': sorted_breakdown,
+        'breakdown': breakdown,
         'summary': {
             'past_day': past_day,
             'past_month': past_month,
@@ -432,18 +754,16 @@ def make_slack_message_field_section(fields: list) -> dict:
         A text field section message for delivery via Slack.
 
     """
-    section = {
+    return {
         'type': 'section',
-        'fields': []
-    }
-    for field in fields:
-        section['fields'].append(
+        'fields': [
             {
                 'type': 'mrkdwn',
                 'text': str(field)
             }
-        )
-    return section
+            for field in fields
+        ]
+    }
 
 
 def generate_gcp_project_link(project_id: str) -> str:
@@ -489,15 +809,15 @@ def make_slack_message_divider() -> dict:
     return {'type': 'divider'}
 
 
-def send_project_ranking_line_to_slack(rank: int, project_data: dict) -> None:
-    """ Sends a ranking message line to Slack.
+def make_project_ranking_blocks(rank: int, project_data: dict) -> list:
+    """ Makes the ranking message line blocks for a project.
 
     Args:
         rank: The number in the ranking.
         project_data: The data for the project.
 
     Returns:
-        None
+        The ranking line blocks.
 
     """
     title = format_project_title(rank,
@@ -505,40 +825,40 @@ def send_project_ranking_line_to_slack(rank: int, project_data: dict) -> None:
                                  project_data['status'])
     past_day = (f"{project_data['one_day_ago']['cost']} " +
                 f"{project_data['one_day_ago']['currency']}")
-    send_slack_message(blocks=[
+    return [
         make_slack_message_field_section(
             [
                 title,
                 past_day
             ]
         )
-    ])
+    ]
 
 
-def send_project_top_services_to_slack(project_id: str,
-                                       top_services: list) -> None:
-    """ Sends a project's top services to Slack.
+def make_project_top_services_blocks(project_id: str,
+                                     top_services: list) -> list:
+    """ Makes the blocks listing a project's top services.
 
     Args:
-        rank: The number in the ranking.
-        project_data: The data for the project.
+        project_id: The project ID the services belong to.
+        top_services: The top services data for the project.
 
     Returns:
-        None
+        The top services blocks.
 
     """
-    send_slack_message(
-        blocks=[make_slack_message_section(
-            f"*Top Services for {project_id}*:")])
+    blocks = [make_slack_message_section(
+        f"*Top Services for {project_id}*:")]
     for service in top_services:
-        send_slack_message(blocks=[
+        blocks.append(
             make_slack_message_field_section(
                 [
                     f"- {service['service_name']}",
                     f"{service['cost']} {service['currency']}"
                 ]
             )
-        ])
+        )
+    return blocks
 
 
 def prepare_summary_line(cost: float, currency: str) -> str:
@@ -555,14 +875,14 @@ def prepare_summary_line(cost: float, currency: str) -> str:
     return (f'{cost} {currency}')
 
 
-def send_summary_to_slack(summary_data: dict) -> None:
-    """Prepares and sends summary data to Slack.
+def make_summary_blocks(summary_data: dict) -> list:
+    """Prepares the summary blocks.
 
     Args:
         summary_data: Contains summary datastructure.
 
     Returns:
-        None
+        The summary blocks.
 
     """
     # Summary Section
@@ -578,8 +898,8 @@ def send_summary_to_slack(summary_data: dict) -> None:
         summary_data['projected_cost']['cost'],
         summary_data['projected_cost']['currency']
     )
-    send_slack_message(blocks=[make_slack_message_section('*Summary*')])
-    send_slack_message(blocks=[
+    return [
+        make_slack_message_section('*Summary*'),
         make_slack_message_field_section(
             [
                 'Total Past Day:', total_past_day,
@@ -587,12 +907,16 @@ def send_summary_to_slack(summary_data: dict) -> None:
                 'Projected Cost:', projected_cost
             ]
         )
-    ])
+    ]
 
 
-def slack_notify(client: Client) -> None:
+async def slack_notify(client: Client) -> None:
     """Prepares analysis data and sends it to Slack.
 
+    The report is assembled into a single list of blocks and posted in as
+    few messages as Slack's per-message block limit allows, rather than one
+    HTTP round-trip per line.
+
     Returns:
         None
 
@@ -600,7 +924,7 @@ def slack_notify(client: Client) -> None:
     analysis_data = get_analysis(client)
 
     # Base Message
-    base_message = [
+    all_blocks = [
         {
             'type': 'section',
             'text': {
@@ -609,31 +933,36 @@ def slack_notify(client: Client) -> None:
             },
         },
     ]
-    base_message.append(make_slack_message_divider())
-    send_slack_message(blocks=base_message)
+    all_blocks.append(make_slack_message_divider())
 
-    # Send project ranking line to Slack
+    # Project ranking lines
     for rank, project_data in enumerate(analysis_data['breakdown'], start=1):
         # Do not report if there was no cost in the past day
         if project_data['one_day_ago']['cost'] > 0:
-            send_project_ranking_line_to_slack(rank, project_data)
+            all_blocks.extend(make_project_ranking_blocks(rank, project_data))
 
-            # Send top services if given
-            if 'top_services' in project_data.keys():
-                send_project_top_services_to_slack(
+            # Add top services if given
+            if 'top_services' in project_data:
+                all_blocks.extend(make_project_top_services_blocks(
                     project_data['id'],
-                    project_data['top_services'])
+                    project_data['top_services']))
+
+    # Trailing overall summary
+    all_blocks.append(make_slack_message_divider())
+    all_blocks.extend(make_summary_blocks(analysis_data['summary']))
 
-    # Prepare and send trailing overally summary
-    send_slack_message(blocks=[make_slack_message_divider()])
-    send_summary_to_slack(analysis_data['summary'])
+    # Sent one after the other: the messages are ordered parts of one
+    # report, and concurrent posts could land in the channel out of order.
+    for start in range(0, len(all_blocks), SLACK_MAX_BLOCKS_PER_MESSAGE):
+        await send_slack_message(
+            blocks=all_blocks[start:start + SLACK_MAX_BLOCKS_PER_MESSAGE])
 
 def run():
     """Executes the analysis and posts to slack
     """
     client = Client()
     SETTINGS.load_from_environment()
-    slack_notify(client)
+    asyncio.run(slack_notify(client))
 
 def subscriber(data: dict, context: dict):
     """Cloud function entrypoint
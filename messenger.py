@@ -6,37 +6,57 @@ Sends Slack messages.
 Functionality:
     * Plain text
     * Markdown block
+
+Attributes:
+    SETTINGS: See `settings.py` for more information.
+    SSL_CONTEXT: The SSL context used for the Slack client.
+
 """
 
-import argparse
-import os
+import functools
 import ssl as ssl_lib
 
 import certifi
-import slack
+
+from slack_sdk.web.async_client import AsyncWebClient
+
+from settings import get_settings
+
+SETTINGS = get_settings()
 
 SSL_CONTEXT = ssl_lib.create_default_context(cafile=certifi.where())
 
-def send_slack_message(channel: str,
-                       api_token: str,
-                       text: str = None,
-                       blocks: list = None):
-    """Sends a slack message.
+
+@functools.lru_cache(maxsize=1)
+def get_client() -> AsyncWebClient:
+    """Returns the shared Slack client.
+
+    Cached so one client serves every send while the cloud function is
+    alive, instead of being constructed per message. Built lazily because
+    the API token is only available once settings have been loaded.
+    """
+    return AsyncWebClient(token=SETTINGS.SLACK_API_TOKEN, ssl=SSL_CONTEXT)
+
+
+async def send_slack_message(text: str = None,
+                             blocks: list = None):
+    """Sends a slack message to the channel from settings.
+
+    Asynchronous, so independent messages can be sent concurrently.
 
     Attributes:
         text: When specified, plain text is sent.
         blocks: When specified, a 'block' is sent.
-        channel: The slack channel to send to.
 
     """
     if not text and not blocks:
-        raise argparse.ArgumentError
-
-    # Client to use whilst the cloud function is alive.
-    client = slack.WebClient(token=api_token, ssl=SSL_CONTEXT)
+        raise ValueError('text or blocks required')
 
+    client = get_client()
+    channel = SETTINGS.SLACK_CHANNEL
     if text:
-        response = client.chat_postMessage(channel=channel, text=text)
+        response = await client.chat_postMessage(channel=channel, text=text)
     if blocks:
-        response = client.chat_postMessage(channel=channel, blocks=blocks)
+        response = await client.chat_postMessage(channel=channel,
+                                                 blocks=blocks)
     assert response["ok"]
@@ -12,6 +12,12 @@ Attributes:
 
     *** ↑ Required ↑ ***
 
+    Settings.SUMMARY_TABLE_NAME (str): Name of a materialized view within
+        `Settings.DATA_SET` that pre-aggregates cost per day, project and
+        currency (see `sql/daily_project_cost.sql`). When set, the cost
+        aggregate queries read from it instead of scanning the raw billing
+        table.
+
     Settings.MINIMUM_COST_FOR_WARNING(str): Sets the minimum cost at which a
         warning can be issued. Any costs that would trigger warnings
         below this level are ignored.
@@ -33,11 +39,13 @@ Attributes:
 
 """
 
+import functools
 import os
 
 
 class Settings:
     # Default Settings
+    SUMMARY_TABLE_NAME = None
     MINIMUM_COST_FOR_WARNING = 10
     ROUNDING_PRECISION = 2
     WARNING_THRESHOLD_MULTIPLIER = 2
@@ -73,22 +81,39 @@ class Settings:
             raise Exception('Must specify SLACK_API_TOKEN')
 
         # General Settings
+        if 'SUMMARY_TABLE_NAME' in os.environ:
+            self.SUMMARY_TABLE_NAME = os.environ['SUMMARY_TABLE_NAME']
+
+        # Numeric settings are cast once here; environment values are always
+        # strings and would otherwise break the arithmetic that uses them.
         if 'MINIMUM_COST_FOR_WARNING' in os.environ:
-            self.MINIMUM_COST_FOR_WARNING = os.environ['MINIMUM_COST_FOR_WARNING']
+            self.MINIMUM_COST_FOR_WARNING = float(
+                os.environ['MINIMUM_COST_FOR_WARNING'])
 
         if 'ROUNDING_PRECISION' in os.environ:
-            self.ROUNDING_PRECISION = os.environ['ROUNDING_PRECISION']
+            self.ROUNDING_PRECISION = int(os.environ['ROUNDING_PRECISION'])
 
         if 'WARNING_THRESHOLD_MULTIPLIER' in os.environ:
-            self.WARNING_THRESHOLD_MULTIPLIER = os.environ[
-                'WARNING_THRESHOLD_MULTIPLIER']
+            self.WARNING_THRESHOLD_MULTIPLIER = float(os.environ[
+                'WARNING_THRESHOLD_MULTIPLIER'])
 
         if 'NUMBER_OF_TOP_SERVICES_TO_INVESTIGATE' in os.environ:
-            self.NUMBER_OF_TOP_SERVICES_TO_INVESTIGATE = os.environ[
-                'NUMBER_OF_TOP_SERVICES_TO_INVESTIGATE']
+            self.NUMBER_OF_TOP_SERVICES_TO_INVESTIGATE = int(os.environ[
+                'NUMBER_OF_TOP_SERVICES_TO_INVESTIGATE'])
 
         if 'STATUS_WARNING' in os.environ:
             self.STATUS_WARNING = os.environ['STATUS_WARNING']
 
         if 'STATUS_NOMINAL' in os.environ:
             self.STATUS_NOMINAL = os.environ['STATUS_NOMINAL']
+
+
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Returns the shared `Settings` instance.
+
+    Cached so every importing module sees the same instance; values loaded
+    from the environment are therefore only parsed once and cannot diverge
+    between modules.
+    """
+    return Settings()
@@ -0,0 +1,18 @@
+-- Materialized view pre-aggregating the billing export per day, project
+-- and currency. BigQuery maintains it incrementally, so the daily and
+-- monthly aggregate queries read a few rows per day instead of scanning
+-- the raw billing table on every run.
+--
+-- Replace the placeholders with the values of the PROJECT_ID, DATA_SET
+-- and TABLE_NAME settings, then set SUMMARY_TABLE_NAME=daily_project_cost
+-- so the tool reads from the view.
+CREATE MATERIALIZED VIEW IF NOT EXISTS
+  `<PROJECT_ID>.<DATA_SET>.daily_project_cost`
+AS
+SELECT
+  DATE(_PARTITIONTIME) as d,
+  project.id as pid,
+  currency as currency,
+  SUM(cost) as cost
+FROM `<PROJECT_ID>.<DATA_SET>.<TABLE_NAME>`
+GROUP BY d, pid, currency;
@@ -1,7 +1,8 @@
 import pytest
 from datetime import date
 from freezegun import freeze_time
-from main import compute_days_remaining_in_present_month, get_days_in_month
+from main import (SETTINGS, compute_days_remaining_in_present_month,
+                  get_days_in_month, get_status)
 
 class TestComputeDaysRemainingInPresentMonth:
     """ Tests for compute_days_remaining_in_present_month
@@ -10,10 +11,36 @@ class TestComputeDaysRemainingInPresentMonth:
     def test_before_end_of_month_returns_days_difference(self):
         assert compute_days_remaining_in_present_month(28) == 14
 
+    @freeze_time("2020-02-14")
+    def test_defaults_to_present_month(self):
+        assert compute_days_remaining_in_present_month() == 15
+
 class TestGetDaysInMonth:
     """ Tests for get_days_in_month
     """
     def test_returns_correct_months_per_month(self):
          assert get_days_in_month(1, 2020) == 31
          assert get_days_in_month(2, 2020) == 29
-         assert get_days_in_month(4, 2020) == 30
\ No newline at end of file
+         assert get_days_in_month(4, 2020) == 30
+
+    @freeze_time("2020-02-14")
+    def test_defaults_to_present_month(self):
+         assert get_days_in_month() == 29
+
+class TestGetStatus:
+    """ Tests for get_status
+    """
+    def test_cost_above_limit_returns_warning(self):
+        assert get_status(50, 20, 2) == SETTINGS.STATUS_WARNING
+
+    def test_cost_below_limit_returns_nominal(self):
+        assert get_status(30, 20, 2) == SETTINGS.STATUS_NOMINAL
+
+    def test_zero_current_cost_returns_nominal(self):
+        assert get_status(0, 20, 2) == SETTINGS.STATUS_NOMINAL
+
+    def test_zero_past_cost_applies_minimum_cost_floor(self):
+        assert get_status(SETTINGS.MINIMUM_COST_FOR_WARNING, 0,
+                          2) == SETTINGS.STATUS_WARNING
+        assert get_status(SETTINGS.MINIMUM_COST_FOR_WARNING - 1, 0,
+                          2) == SETTINGS.STATUS_NOMINAL
\ No newline at end of file
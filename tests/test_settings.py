@@ -0,0 +1,36 @@
+import pytest
+from settings import Settings
+
+REQUIRED_ENVIRONMENT = {
+    'PROJECT_ID': 'test-project',
+    'DATA_SET': 'test-dataset',
+    'TABLE_NAME': 'test-table',
+    'SLACK_CHANNEL': '#test-channel',
+    'SLACK_API_TOKEN': 'test-token',
+}
+
+class TestLoadFromEnvironment:
+    """ Tests for Settings.load_from_environment
+    """
+    def test_numeric_settings_are_cast_from_environment(self, monkeypatch):
+        for key, value in REQUIRED_ENVIRONMENT.items():
+            monkeypatch.setenv(key, value)
+        monkeypatch.setenv('MINIMUM_COST_FOR_WARNING', '15')
+        monkeypatch.setenv('ROUNDING_PRECISION', '3')
+        monkeypatch.setenv('WARNING_THRESHOLD_MULTIPLIER', '1.5')
+        monkeypatch.setenv('NUMBER_OF_TOP_SERVICES_TO_INVESTIGATE', '7')
+
+        settings = Settings()
+        settings.load_from_environment()
+
+        assert settings.MINIMUM_COST_FOR_WARNING == 15
+        assert settings.ROUNDING_PRECISION == 3
+        assert settings.WARNING_THRESHOLD_MULTIPLIER == 1.5
+        assert settings.NUMBER_OF_TOP_SERVICES_TO_INVESTIGATE == 7
+
+    def test_missing_required_setting_raises(self, monkeypatch):
+        for key in REQUIRED_ENVIRONMENT:
+            monkeypatch.delenv(key, raising=False)
+
+        with pytest.raises(Exception):
+            Settings().load_from_environment()